@@ -1,909 +1,1582 @@
-#!/usr/bin/env python3
-"""
-Tableau Server Migration Tool
-
-This script allows migrating workbooks from one Tableau server to another,
-supporting different sites and folder structures.
-"""
-
-import os
-import sys
-import argparse
-import getpass
-import logging
-import tempfile
-import tableauserverclient as TSC
-from pathlib import Path
-import time
-import re
-
-# Add dotenv support for reading environment variables
-try:
-    from dotenv import load_dotenv
-    DOTENV_AVAILABLE = True
-except ImportError:
-    DOTENV_AVAILABLE = False
-
-
-class TableauMigrator:
-    def __init__(self, source_server, target_server, source_site, target_site, 
-                 logger=None, source_token_name=None, source_token_value=None, 
-                 target_token_name=None, target_token_value=None,
-                 source_username=None, source_password=None, 
-                 target_username=None, target_password=None,
-                 verify_ssl=True, api_version=None, download_dir=None, 
-                 include_extract=False, skip_data_sources=False):
-        
-        self.source_server_url = source_server
-        self.target_server_url = target_server
-        self.source_site = source_site
-        self.target_site = target_site
-        self.api_version = api_version
-        self.include_extract = include_extract
-        self.skip_data_sources = skip_data_sources
-        
-        # Authentication info
-        self.source_token_name = source_token_name
-        self.source_token_value = source_token_value
-        self.target_token_name = target_token_name
-        self.target_token_value = target_token_value
-        self.source_username = source_username
-        self.source_password = source_password
-        self.target_username = target_username
-        self.target_password = target_password
-        
-        # SSL verification
-        self.verify_ssl = verify_ssl
-        if not verify_ssl:
-            import urllib3
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            logger.warning("SSL certificate verification is disabled. This is insecure.")
-        
-        # Server connections
-        self.source_server = None
-        self.target_server = None
-        
-        # Set up logging
-        if logger:
-            self.logger = logger
-        else:
-            self.logger = logging.getLogger('tableau_migrator')
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
-            self.logger.setLevel(logging.INFO)
-        
-        # Set up temp directory
-        if download_dir:
-            self.temp_dir = download_dir
-            if not os.path.exists(self.temp_dir):
-                os.makedirs(self.temp_dir)
-                self.logger.info(f"Created download directory: {self.temp_dir}")
-            else:
-                self.logger.info(f"Using existing download directory: {self.temp_dir}")
-            self.should_delete_temp_dir = False
-        else:
-            self.temp_dir = tempfile.mkdtemp()
-            self.logger.info(f"Created temporary directory: {self.temp_dir}")
-            self.should_delete_temp_dir = True
-
-    def connect_to_source(self):
-        """Connect to the source Tableau server"""
-        self.logger.info(f"Connecting to source server: {self.source_server_url}, site: {self.source_site}")
-        
-        if self.source_token_name and self.source_token_value:
-            auth = TSC.PersonalAccessTokenAuth(
-                token_name=self.source_token_name,
-                personal_access_token=self.source_token_value,
-                site_id=self.source_site
-            )
-            self.logger.info(f"Using token authentication for source server")
-        elif self.source_username:
-            password = self.source_password or getpass.getpass("Source Server Password: ")
-            auth = TSC.TableauAuth(self.source_username, password, site_id=self.source_site)
-            self.logger.info(f"Using username/password authentication for source server")
-        else:
-            raise ValueError("No authentication credentials provided for source server")
-        
-        # Use auto-detect if no version is specified
-        use_server_version = True if self.api_version is None else False
-        
-        self.source_server = TSC.Server(self.source_server_url, use_server_version=use_server_version, 
-                                       http_options={"verify": self.verify_ssl})
-        
-        # Set API version if specified
-        if self.api_version:
-            self.source_server.version = self.api_version
-            self.logger.info(f"Using API version: {self.api_version}")
-        
-        self.source_server.auth.sign_in(auth)
-        self.logger.info(f"Successfully connected to source server")
-        return self.source_server
-
-    def connect_to_target(self):
-        """Connect to the target Tableau server"""
-        self.logger.info(f"Connecting to target server: {self.target_server_url}, site: {self.target_site}")
-        
-        if self.target_token_name and self.target_token_value:
-            auth = TSC.PersonalAccessTokenAuth(
-                token_name=self.target_token_name,
-                personal_access_token=self.target_token_value,
-                site_id=self.target_site
-            )
-            self.logger.info(f"Using token authentication for target server")
-        elif self.target_username:
-            password = self.target_password or getpass.getpass("Target Server Password: ")
-            auth = TSC.TableauAuth(self.target_username, password, site_id=self.target_site)
-            self.logger.info(f"Using username/password authentication for target server")
-        else:
-            raise ValueError("No authentication credentials provided for target server")
-        
-        # Use auto-detect if no version is specified
-        use_server_version = True if self.api_version is None else False
-        
-        self.target_server = TSC.Server(self.target_server_url, use_server_version=use_server_version,
-                                       http_options={"verify": self.verify_ssl})
-        
-        # Set API version if specified
-        if self.api_version:
-            self.target_server.version = self.api_version
-            self.logger.info(f"Using API version: {self.api_version}")
-        
-        self.target_server.auth.sign_in(auth)
-        self.logger.info(f"Successfully connected to target server")
-        return self.target_server
-
-    def list_source_sites(self):
-        """List all sites on the source server"""
-        if not self.source_server:
-            self.connect_to_source()
-        
-        all_sites = list(TSC.Pager(self.source_server.sites))
-        self.logger.info(f"Found {len(all_sites)} sites on source server")
-        return all_sites
-    
-    def list_projects(self, server, site=None):
-        """List all projects on a server/site"""
-        if site and server.site_id != site:
-            # Switch to the specified site if needed
-            current_site = server.site_id
-            self.logger.info(f"Switching from site {current_site} to {site}")
-            server.auth.switch_site(site)
-        
-        all_projects = list(TSC.Pager(server.projects))
-        self.logger.info(f"Found {len(all_projects)} projects on site {server.site_id}")
-        return all_projects
-    
-    def list_workbooks(self, server, site=None, project_id=None):
-        """List all workbooks on a server/site, optionally filtered by project"""
-        if site and server.site_id != site:
-            # Switch to the specified site if needed
-            current_site = server.site_id
-            self.logger.info(f"Switching from site {current_site} to {site}")
-            server.auth.switch_site(site)
-        
-        try:
-            # Get all workbooks without any options that could trigger API compatibility issues
-            all_workbooks = []
-            for wb in TSC.Pager(server.workbooks):
-                all_workbooks.append(wb)
-            
-            self.logger.info(f"Retrieved {len(all_workbooks)} total workbooks from site {server.site_id}")
-            
-            # Filter locally by project_id if needed
-            if project_id:
-                # Debug info: Log all project IDs to help troubleshoot
-                if self.logger.level <= logging.DEBUG:
-                    project_ids = set(wb.project_id for wb in all_workbooks)
-                    self.logger.debug(f"Available project IDs in workbooks: {project_ids}")
-                    self.logger.debug(f"Looking for project ID: {project_id}")
-                
-                # More flexible comparison - convert both to strings for comparison
-                filtered_workbooks = [wb for wb in all_workbooks 
-                                     if str(wb.project_id).lower() == str(project_id).lower()]
-                
-                self.logger.info(f"Filtered to {len(filtered_workbooks)} workbooks in project {project_id}")
-                return filtered_workbooks
-            else:
-                return all_workbooks
-                
-        except Exception as e:
-            self.logger.error(f"Error listing workbooks: {str(e)}")
-            return []
-    
-    def ensure_project_exists(self, project_name, parent_id=None):
-        """Make sure a project exists on the target server, create if it doesn't"""
-        # Check if project exists
-        req_option = TSC.RequestOptions()
-        req_option.filter.add(TSC.Filter(TSC.RequestOptions.Field.Name, 
-                                          TSC.RequestOptions.Operator.Equals, 
-                                          project_name))
-        
-        matching_projects = list(TSC.Pager(self.target_server.projects, req_option))
-        
-        if matching_projects:
-            for project in matching_projects:
-                # If parent_id is None, we're looking for top-level project
-                # If parent_id is not None, we need to match it
-                if (parent_id is None and project.parent_id is None) or \
-                   (parent_id is not None and project.parent_id == parent_id):
-                    self.logger.info(f"Found existing project: {project_name}")
-                    return project
-        
-        # Create the project if it doesn't exist
-        new_project = TSC.ProjectItem(name=project_name, parent_id=parent_id)
-        new_project = self.target_server.projects.create(new_project)
-        self.logger.info(f"Created new project: {project_name}")
-        return new_project
-    
-    def migrate_workbook(self, workbook_id, source_project, target_project_id):
-        """Migrate a single workbook from source to target
-        
-        This is a copy operation - workbooks are copied to the target server
-        but remain intact on the source server.
-        """
-        if not self.source_server:
-            self.connect_to_source()
-        if not self.target_server:
-            self.connect_to_target()
-        
-        # First verify the workbook exists
-        try:
-            # Check if workbook exists before attempting download
-            self.logger.info(f"Verifying workbook exists with ID: {workbook_id}")
-            try:
-                workbook = self.source_server.workbooks.get_by_id(workbook_id)
-                self.logger.info(f"Found workbook: {workbook.name} (ID: {workbook_id})")
-            except Exception as wb_err:
-                self.logger.error(f"Error finding workbook with ID {workbook_id}: {str(wb_err)}")
-                
-                # Try to list workbooks in the project to suggest valid IDs
-                try:
-                    project_workbooks = self.list_workbooks(self.source_server, project_id=source_project)
-                    if project_workbooks:
-                        self.logger.info("Available workbooks in this project:")
-                        for wb in project_workbooks:
-                            self.logger.info(f"  - {wb.name} (ID: {wb.id})")
-                    else:
-                        self.logger.info(f"No workbooks found in project ID: {source_project}")
-                except Exception as list_err:
-                    self.logger.error(f"Error listing workbooks: {str(list_err)}")
-                
-                raise ValueError(f"Workbook with ID '{workbook_id}' not found. Please verify the ID is correct.")
-            
-            # Create safe filenames without characters that might cause issues
-            safe_filename = re.sub(r'[^\w\-_.]', '_', f"workbook_{workbook_id}")
-            
-            # Try two different file extensions
-            file_extensions = ['.twbx', '.twb']
-            downloaded = False
-            workbook_file = None
-            error_messages = []
-            
-            for ext in file_extensions:
-                if downloaded:
-                    break
-                    
-                workbook_file = os.path.join(self.temp_dir, f"{safe_filename}{ext}")
-                self.logger.info(f"Attempting to download workbook {workbook_id} to {workbook_file}")
-                
-                try:
-                    # Specify include_extract based on user option
-                    self.source_server.workbooks.download(workbook_id, workbook_file, include_extract=self.include_extract)
-                    
-                    # Verify file was downloaded and exists
-                    if os.path.exists(workbook_file):
-                        file_size = os.path.getsize(workbook_file)
-                        self.logger.info(f"Downloaded workbook file size: {file_size} bytes")
-                        
-                        if file_size > 0:
-                            downloaded = True
-                            self.logger.info(f"Successfully downloaded workbook to {workbook_file}")
-                        else:
-                            os.remove(workbook_file)
-                            error_messages.append(f"Downloaded file is empty (extension: {ext})")
-                    else:
-                        error_messages.append(f"File does not exist after download (extension: {ext})")
-                except Exception as download_err:
-                    error_messages.append(f"Error during download with extension {ext}: {str(download_err)}")
-            
-            # If no successful download, try a fallback approach
-            if not downloaded:
-                try:
-                    self.logger.info("Trying alternative download approach...")
-                    # Create a simpler path with a basic file name
-                    workbook_file = os.path.join(self.temp_dir, "workbook.twbx")
-                    
-                    # Try a different API approach - note: no_extract was incorrect
-                    # The correct parameter is include_extract
-                    self.logger.info(f"Downloading to directory {self.temp_dir} with include_extract={self.include_extract}")
-                    try:
-                        download_path = self.source_server.workbooks.download(workbook_id, 
-                                                                            filepath=self.temp_dir, 
-                                                                            include_extract=self.include_extract)
-                        self.logger.info(f"Download path returned: {download_path}")
-                    except TypeError:
-                        # Older versions of TSC might not support the include_extract parameter
-                        self.logger.info("Trying download without extra parameters")
-                        download_path = self.source_server.workbooks.download(workbook_id, 
-                                                                            filepath=self.temp_dir)
-                    
-                    # Handle the case where the path is returned as a string
-                    if isinstance(download_path, str) and os.path.exists(download_path):
-                        workbook_file = download_path
-                        file_size = os.path.getsize(workbook_file)
-                        self.logger.info(f"Alternative download succeeded with path return. File: {workbook_file}, size: {file_size} bytes")
-                        downloaded = True
-                    # Or the case where the download method returns None but creates the file
-                    elif download_path is None:
-                        # Look for any new files in the temp dir that might be our workbook
-                        possible_files = [f for f in os.listdir(self.temp_dir) 
-                                        if f.endswith('.twb') or f.endswith('.twbx')]
-                        if possible_files:
-                            newest_file = max(possible_files, key=lambda f: os.path.getctime(os.path.join(self.temp_dir, f)))
-                            workbook_file = os.path.join(self.temp_dir, newest_file)
-                            if os.path.exists(workbook_file):
-                                file_size = os.path.getsize(workbook_file)
-                                self.logger.info(f"Found potential workbook file: {workbook_file}, size: {file_size} bytes")
-                                downloaded = True
-                        else:
-                            error_messages.append("No workbook files found in download directory")
-                    else:
-                        error_messages.append("Alternative download approach returned a path, but file does not exist")
-                except Exception as alt_err:
-                    error_messages.append(f"Alternative download approach failed: {str(alt_err)}")
-                    self.logger.error(f"Exception details: {alt_err.__class__.__name__}: {str(alt_err)}")
-                    import traceback
-                    self.logger.error(f"Traceback: {traceback.format_exc()}")
-            
-            # If still not downloaded, raise error with all the messages
-            if not downloaded:
-                error_detail = "\n".join(error_messages)
-                self.logger.error(f"All download attempts failed:\n{error_detail}")
-                raise FileNotFoundError(f"Failed to download workbook {workbook_id} after multiple attempts")
-            
-            # Small delay to ensure file is fully flushed to disk
-            time.sleep(1)
-            
-            # Create a new workbook item with the target project id
-            new_workbook = TSC.WorkbookItem(project_id=target_project_id, name=workbook.name)
-            
-            # Upload to target
-            self.logger.info(f"Uploading workbook {workbook.name} to target project {target_project_id}")
-            
-            try:
-                # Try with CreateNew instead of Overwrite if there are issues
-                publish_mode = TSC.Server.PublishMode.Overwrite
-                
-                # Make sure the file is accessible and readable
-                with open(workbook_file, 'rb') as file_check:
-                    file_check.read(1024)  # Read a small chunk to verify file is accessible
-                    self.logger.info("File is readable")
-                
-                self.logger.info(f"Publishing with mode: {publish_mode}")
-                
-                # Check for older version of tableauserverclient
-                if self.skip_data_sources:
-                    self.logger.info("Publishing without data source connections (--skip-data-sources enabled)")
-                    
-                    # For older versions, we can't disable connections, so we'll just publish normally
-                    # and warn the user
-                    self.logger.warning("Your version of tableauserverclient doesn't support skipping data sources.")
-                    self.logger.warning("The workbook will be published with data connections.")
-                    self.logger.warning("If this fails due to permissions, you'll need to update tableauserverclient:")
-                    self.logger.warning("pip install tableauserverclient --upgrade")
-                
-                # Basic publish with no extra options
-                self.target_server.workbooks.publish(new_workbook, workbook_file, publish_mode)
-                    
-                self.logger.info(f"Successfully migrated workbook {workbook.name}")
-            except Exception as upload_error:
-                self.logger.error(f"Error publishing workbook: {str(upload_error)}")
-                self.logger.error(f"Workbook file exists: {os.path.exists(workbook_file)}")
-                self.logger.error(f"Workbook file size: {os.path.getsize(workbook_file) if os.path.exists(workbook_file) else 'N/A'}")
-                self.logger.error(f"Target project exists: {target_project_id}")
-                
-                # Try with different publish mode
-                try:
-                    self.logger.info("Trying alternative publish mode...")
-                    publish_mode = TSC.Server.PublishMode.CreateNew
-                    self.logger.info(f"Publishing with mode: {publish_mode}")
-                    
-                    # Basic publish with no extra options
-                    self.target_server.workbooks.publish(new_workbook, workbook_file, publish_mode)
-                        
-                    self.logger.info(f"Successfully migrated workbook {workbook.name} with alternative mode")
-                except Exception as retry_error:
-                    self.logger.error(f"Alternative publish mode also failed: {str(retry_error)}")
-                    raise
-                    
-        except Exception as e:
-            self.logger.error(f"Migration failed: {str(e)}")
-            raise
-        finally:
-            # Clean up the temp file only if we're not keeping the download directory
-            if workbook_file and os.path.exists(workbook_file) and self.should_delete_temp_dir:
-                try:
-                    os.remove(workbook_file)
-                    self.logger.info(f"Removed temporary file: {workbook_file}")
-                except Exception as cleanup_error:
-                    self.logger.warning(f"Failed to remove temporary file: {str(cleanup_error)}")
-    
-    def migrate_project(self, source_project_id, target_project_id=None):
-        """Migrate all workbooks from a source project to a target project
-        
-        This is a copy operation - all content remains intact on the source server.
-        """
-        if not self.source_server:
-            self.connect_to_source()
-        if not self.target_server:
-            self.connect_to_target()
-        
-        # Get source project details
-        source_project = self.source_server.projects.get_by_id(source_project_id)
-        
-        # If no target project ID is provided, create or find a matching project
-        if not target_project_id:
-            target_project = self.ensure_project_exists(source_project.name, source_project.parent_id)
-            target_project_id = target_project.id
-        
-        # Get all workbooks in the source project
-        workbooks = self.list_workbooks(self.source_server, project_id=source_project_id)
-        
-        # Migrate each workbook
-        for workbook in workbooks:
-            self.migrate_workbook(workbook.id, source_project, target_project_id)
-        
-        self.logger.info(f"Successfully migrated {len(workbooks)} workbooks from project {source_project.name}")
-    
-    def migrate_site(self, source_site_id=None, target_site_id=None):
-        """Migrate all projects and workbooks from a source site to a target site
-        
-        This is a copy operation - all content remains intact on the source server.
-        """
-        # Use current site if none specified
-        source_site_id = source_site_id or self.source_site
-        target_site_id = target_site_id or self.target_site
-        
-        # Ensure we're connected to both servers
-        if not self.source_server:
-            self.connect_to_source()
-        if not self.target_server:
-            self.connect_to_target()
-        
-        # Switch to the specified sites if needed
-        if self.source_server.site_id != source_site_id:
-            self.source_server.auth.switch_site(source_site_id)
-        
-        if self.target_server.site_id != target_site_id:
-            self.target_server.auth.switch_site(target_site_id)
-        
-        # Get all projects in the source site
-        source_projects = self.list_projects(self.source_server)
-        
-        # Create project hierarchy mapping
-        project_map = {}
-        
-        # First pass: create all top-level projects
-        for project in source_projects:
-            if not project.parent_id:
-                target_project = self.ensure_project_exists(project.name)
-                project_map[project.id] = target_project.id
-        
-        # Second pass: create all child projects 
-        # This might need multiple passes for deep hierarchies
-        remaining_projects = [p for p in source_projects if p.parent_id]
-        while remaining_projects:
-            projects_handled = []
-            for project in remaining_projects:
-                if project.parent_id in project_map:
-                    # Parent has been created, so we can create this one
-                    target_parent_id = project_map[project.parent_id]
-                    target_project = self.ensure_project_exists(project.name, target_parent_id)
-                    project_map[project.id] = target_project.id
-                    projects_handled.append(project)
-            
-            if not projects_handled:
-                # If we didn't handle any projects in this pass, we have an issue
-                self.logger.error(f"Unable to create project hierarchy for {len(remaining_projects)} projects")
-                break
-                
-            # Remove handled projects from the remaining list
-            remaining_projects = [p for p in remaining_projects if p not in projects_handled]
-        
-        # Now migrate all projects
-        for source_project_id, target_project_id in project_map.items():
-            self.migrate_project(source_project_id, target_project_id)
-        
-        self.logger.info(f"Successfully migrated site {source_site_id} to {target_site_id}")
-    
-    def cleanup(self):
-        """Clean up temporary files and sign out of servers"""
-        # Clean up temp directory
-        if self.should_delete_temp_dir:
-            import shutil
-            try:
-                if os.path.exists(self.temp_dir):
-                    shutil.rmtree(self.temp_dir)
-                    self.logger.info(f"Removed temporary directory: {self.temp_dir}")
-            except Exception as e:
-                self.logger.warning(f"Error cleaning up temporary directory: {str(e)}")
-        else:
-            self.logger.info(f"Keeping download directory: {self.temp_dir}")
-        
-        # Sign out of servers
-        try:
-            if self.source_server:
-                self.source_server.auth.sign_out()
-                self.logger.info("Signed out of source server")
-        except Exception as e:
-            self.logger.warning(f"Error signing out of source server: {str(e)}")
-        
-        try:
-            if self.target_server:
-                self.target_server.auth.sign_out()
-                self.logger.info("Signed out of target server")
-        except Exception as e:
-            self.logger.warning(f"Error signing out of target server: {str(e)}")
-
-    def list_workbooks_by_project_name(self, server, project_name, site=None):
-        """List all workbooks in a project identified by name"""
-        if site and server.site_id != site:
-            # Switch to the specified site if needed
-            current_site = server.site_id
-            self.logger.info(f"Switching from site {current_site} to {site}")
-            server.auth.switch_site(site)
-        
-        # First, get all projects to find the one with the matching name
-        try:
-            all_projects = list(TSC.Pager(server.projects))
-            self.logger.info(f"Found {len(all_projects)} projects on site {server.site_id}")
-            
-            # Find projects with matching name (case insensitive)
-            matching_projects = [p for p in all_projects 
-                               if p.name.lower() == project_name.lower()]
-            
-            if not matching_projects:
-                self.logger.error(f"No project found with name: {project_name}")
-                return []
-            
-            if len(matching_projects) > 1:
-                self.logger.warning(f"Multiple projects found with name: {project_name}. Using the first one.")
-            
-            target_project = matching_projects[0]
-            self.logger.info(f"Found project '{target_project.name}' with ID: {target_project.id}")
-            
-            # Now get workbooks for this project
-            return self.list_workbooks(server, site, target_project.id)
-            
-        except Exception as e:
-            self.logger.error(f"Error listing workbooks by project name: {str(e)}")
-            return []
-
-    def find_workbook_by_name(self, server, workbook_name, project_id=None, site=None):
-        """Find a workbook by name, optionally filtered by project"""
-        if site and server.site_id != site:
-            # Switch to the specified site if needed
-            current_site = server.site_id
-            self.logger.info(f"Switching from site {current_site} to {site}")
-            server.auth.switch_site(site)
-        
-        try:
-            # Get all workbooks
-            all_workbooks = self.list_workbooks(server, project_id=project_id)
-            
-            # Find workbooks with matching name (case insensitive)
-            matching_workbooks = [wb for wb in all_workbooks 
-                                if wb.name.lower() == workbook_name.lower()]
-            
-            if not matching_workbooks:
-                self.logger.warning(f"No workbook found with name: {workbook_name}")
-                if project_id:
-                    self.logger.info(f"Available workbooks in project {project_id}:")
-                    for wb in all_workbooks:
-                        self.logger.info(f"  - {wb.name} (ID: {wb.id})")
-                return None
-            
-            if len(matching_workbooks) > 1:
-                self.logger.warning(f"Multiple workbooks found with name: {workbook_name}. Using the first one.")
-            
-            target_workbook = matching_workbooks[0]
-            self.logger.info(f"Found workbook '{target_workbook.name}' with ID: {target_workbook.id}")
-            
-            return target_workbook
-            
-        except Exception as e:
-            self.logger.error(f"Error finding workbook by name: {str(e)}")
-            return None
-
-
-def main():
-    parser = argparse.ArgumentParser(description="Migrate workbooks between Tableau servers")
-    
-    # Server connection options
-    parser.add_argument("--source-server", "-ss", 
-                        help="Source Tableau server URL (e.g., https://tableau.example.com)")
-    parser.add_argument("--target-server", "-ts", 
-                        help="Target Tableau server URL (e.g., https://tableau-target.example.com)")
-    parser.add_argument("--source-site", "-ssite", default="",
-                        help="Source site ID (use empty string for default site)")
-    parser.add_argument("--target-site", "-tsite", default="",
-                        help="Target site ID (use empty string for default site)")
-    parser.add_argument("--no-ssl-verify", action="store_true",
-                        help="Disable SSL certificate verification (insecure, but useful for self-signed certs)")
-    parser.add_argument("--api-version", 
-                        help="Specify Tableau Server REST API version (e.g., 3.4, 3.10)")
-    parser.add_argument("--download-dir",
-                        help="Specify a custom directory for workbook downloads (optional)")
-    parser.add_argument("--include-extract", action="store_true",
-                        help="Include data extract when downloading workbooks (may make file larger)")
-    parser.add_argument("--skip-data-sources", action="store_true",
-                        help="Skip data source connections when publishing (helps with permission issues)")
-    parser.add_argument("--env-file", default=".env",
-                        help="Path to .env file for credentials (default: .env in current directory)")
-    
-    # Authentication options - Source
-    source_auth = parser.add_argument_group("Source Server Authentication")
-    source_auth_method = source_auth.add_mutually_exclusive_group(required=False)
-    source_auth_method.add_argument("--source-token-name", "-stn",
-                                  help="Name of personal access token for source server")
-    source_auth_method.add_argument("--source-username", "-su",
-                                  help="Username for source server")
-    source_auth.add_argument("--source-token-value", "-stv",
-                           help="Value of personal access token for source server")
-    source_auth.add_argument("--source-password", "-sp",
-                           help="Password for source server")
-    
-    # Authentication options - Target
-    target_auth = parser.add_argument_group("Target Server Authentication")
-    target_auth_method = target_auth.add_mutually_exclusive_group(required=False)
-    target_auth_method.add_argument("--target-token-name", "-ttn",
-                                  help="Name of personal access token for target server")
-    target_auth_method.add_argument("--target-username", "-tu",
-                                  help="Username for target server")
-    target_auth.add_argument("--target-token-value", "-ttv",
-                           help="Value of personal access token for target server")
-    target_auth.add_argument("--target-password", "-tp",
-                           help="Password for target server")
-    
-    # Action to perform
-    action = parser.add_argument_group("Migration Action")
-    action_type = action.add_mutually_exclusive_group(required=True)
-    action_type.add_argument("--list-sites", action="store_true",
-                           help="List available sites on source server")
-    action_type.add_argument("--list-projects", action="store_true",
-                           help="List available projects on source site")
-    action_type.add_argument("--list-workbooks", action="store_true",
-                           help="List available workbooks on source site")
-    action_type.add_argument("--migrate-workbook", "-mw",
-                           help="ID of workbook to migrate")
-    action_type.add_argument("--migrate-workbook-by-name", "-mwn",
-                           help="Name of workbook to migrate")
-    action_type.add_argument("--migrate-project", "-mp",
-                           help="ID of project to migrate")
-    action_type.add_argument("--migrate-site", action="store_true",
-                           help="Migrate entire site")
-    
-    # Additional options
-    parser.add_argument("--source-project-id", "-spid",
-                      help="Source project ID (for --list-workbooks or --migrate-workbook)")
-    parser.add_argument("--source-project-name", "-spname",
-                      help="Source project name (alternative to --source-project-id)")
-    parser.add_argument("--target-project-id", "-tpid",
-                      help="Target project ID (optional for --migrate-workbook and --migrate-project)")
-    parser.add_argument("--target-project-name", "-tpname",
-                      help="Target project name (alternative to --target-project-id)")
-    parser.add_argument("--verbosity", "-v", choices=["debug", "info", "warning", "error"],
-                      default="info", help="Logging verbosity")
-    
-    args = parser.parse_args()
-    
-    # Load environment variables from .env file if available
-    if DOTENV_AVAILABLE:
-        env_file = args.env_file
-        if os.path.exists(env_file):
-            load_dotenv(env_file)
-            print(f"Loaded environment variables from {env_file}")
-        else:
-            print(f"Warning: Environment file {env_file} not found")
-    else:
-        print("Warning: python-dotenv not installed. Cannot load .env file.")
-        print("Install with: pip install python-dotenv")
-    
-    # Use arguments if provided, otherwise try environment variables
-    source_server = args.source_server or os.environ.get("TABLEAU_SOURCE_SERVER")
-    target_server = args.target_server or os.environ.get("TABLEAU_TARGET_SERVER")
-    source_site = args.source_site or os.environ.get("TABLEAU_SOURCE_SITE", "")
-    target_site = args.target_site or os.environ.get("TABLEAU_TARGET_SITE", "")
-    
-    # Source auth
-    source_token_name = args.source_token_name or os.environ.get("TABLEAU_SOURCE_TOKEN_NAME")
-    source_token_value = args.source_token_value or os.environ.get("TABLEAU_SOURCE_TOKEN_VALUE")
-    source_username = args.source_username or os.environ.get("TABLEAU_SOURCE_USERNAME")
-    source_password = args.source_password or os.environ.get("TABLEAU_SOURCE_PASSWORD")
-    
-    # Target auth
-    target_token_name = args.target_token_name or os.environ.get("TABLEAU_TARGET_TOKEN_NAME")
-    target_token_value = args.target_token_value or os.environ.get("TABLEAU_TARGET_TOKEN_VALUE")
-    target_username = args.target_username or os.environ.get("TABLEAU_TARGET_USERNAME")
-    target_password = args.target_password or os.environ.get("TABLEAU_TARGET_PASSWORD")
-    
-    # API Version
-    api_version = args.api_version or os.environ.get("TABLEAU_API_VERSION")
-    
-    # Validate required parameters
-    if not source_server:
-        parser.error("Source server must be provided via --source-server or TABLEAU_SOURCE_SERVER environment variable")
-    
-    # Source auth validation
-    if not (source_token_name or source_username):
-        parser.error("Source authentication must be provided via command line arguments or environment variables")
-    
-    # Target auth validation for migration operations
-    if (args.migrate_workbook or args.migrate_workbook_by_name or args.migrate_project or args.migrate_site):
-        if not target_server:
-            parser.error("Target server must be provided for migration operations")
-        if not (target_token_name or target_username):
-            parser.error("Target authentication must be provided for migration operations")
-    
-    # Check that target server is provided for migration operations
-    if (args.migrate_workbook or args.migrate_workbook_by_name or args.migrate_project or args.migrate_site) and not target_server:
-        parser.error("--target-server is required for migration operations")
-    
-    # Set up logging
-    logging_level = getattr(logging, args.verbosity.upper())
-    logger = logging.getLogger('tableau_migrator')
-    logger.setLevel(logging_level)
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-    
-    # Create migrator
-    migrator = TableauMigrator(
-        source_server=source_server,
-        target_server=target_server,
-        source_site=source_site,
-        target_site=target_site,
-        logger=logger,
-        source_token_name=source_token_name,
-        source_token_value=source_token_value,
-        target_token_name=target_token_name,
-        target_token_value=target_token_value,
-        source_username=source_username,
-        source_password=source_password,
-        target_username=target_username,
-        target_password=target_password,
-        verify_ssl=not args.no_ssl_verify,
-        api_version=api_version,
-        download_dir=args.download_dir,
-        include_extract=args.include_extract,
-        skip_data_sources=args.skip_data_sources
-    )
-    
-    try:
-        # Execute requested action
-        if args.list_sites:
-            sites = migrator.list_source_sites()
-            print("\nAvailable sites on source server:")
-            for site in sites:
-                print(f"  - {site.name} (ID: {site.id}, URL: {site.content_url})")
-        
-        elif args.list_projects:
-            migrator.connect_to_source()
-            projects = migrator.list_projects(migrator.source_server)
-            print("\nAvailable projects on source site:")
-            for project in projects:
-                parent = f" (Parent ID: {project.parent_id})" if project.parent_id else ""
-                print(f"  - {project.name} (ID: {project.id}){parent}")
-        
-        elif args.list_workbooks:
-            migrator.connect_to_source()
-            
-            # Get workbooks - either by project ID, project name, or all
-            if args.source_project_id:
-                workbooks = migrator.list_workbooks(migrator.source_server, 
-                                                  project_id=args.source_project_id)
-            elif args.source_project_name:
-                workbooks = migrator.list_workbooks_by_project_name(migrator.source_server,
-                                                                   args.source_project_name)
-            else:
-                workbooks = migrator.list_workbooks(migrator.source_server)
-            
-            print("\nAvailable workbooks:")
-            for workbook in workbooks:
-                # Print project ID to help with troubleshooting
-                print(f"  - {workbook.name} (ID: {workbook.id}, Project ID: {workbook.project_id})")
-        
-        elif args.migrate_workbook or args.migrate_workbook_by_name:
-            # For both workbook migration methods, we need a source project
-            if not args.source_project_id and not args.source_project_name:
-                logger.error("Either --source-project-id or --source-project-name is required when migrating a workbook")
-                sys.exit(1)
-                
-            migrator.connect_to_source()
-            migrator.connect_to_target()
-            
-            # Get source project ID - either directly provided or looked up by name
-            source_project_id = args.source_project_id
-            if not source_project_id and args.source_project_name:
-                # Find project by name
-                all_projects = list(TSC.Pager(migrator.source_server.projects))
-                matching_projects = [p for p in all_projects 
-                                   if p.name.lower() == args.source_project_name.lower()]
-                
-                if not matching_projects:
-                    logger.error(f"No project found with name: {args.source_project_name}")
-                    sys.exit(1)
-                
-                if len(matching_projects) > 1:
-                    logger.warning(f"Multiple projects found with name: {args.source_project_name}. Using the first one.")
-                
-                source_project_id = matching_projects[0].id
-                logger.info(f"Found source project '{matching_projects[0].name}' with ID: {source_project_id}")
-            
-            # If using --migrate-workbook-by-name, look up the workbook ID
-            workbook_id = args.migrate_workbook
-            if not workbook_id and args.migrate_workbook_by_name:
-                logger.info(f"Looking for workbook with name: {args.migrate_workbook_by_name}")
-                workbook = migrator.find_workbook_by_name(migrator.source_server, 
-                                                         args.migrate_workbook_by_name, 
-                                                         source_project_id)
-                if not workbook:
-                    logger.error(f"Could not find workbook with name: {args.migrate_workbook_by_name}")
-                    sys.exit(1)
-                workbook_id = workbook.id
-                logger.info(f"Found workbook '{workbook.name}' with ID: {workbook_id}")
-            
-            # If target project specified by name, look it up
-            target_project_id = args.target_project_id
-            if not target_project_id and args.target_project_name:
-                # Find project by name
-                all_target_projects = list(TSC.Pager(migrator.target_server.projects))
-                matching_target_projects = [p for p in all_target_projects 
-                                         if p.name.lower() == args.target_project_name.lower()]
-                
-                if not matching_target_projects:
-                    logger.info(f"No target project found with name: {args.target_project_name}. Will create it.")
-                    # We'll create this project below
-                else:
-                    if len(matching_target_projects) > 1:
-                        logger.warning(f"Multiple target projects found with name: {args.target_project_name}. Using the first one.")
-                    
-                    target_project_id = matching_target_projects[0].id
-                    logger.info(f"Found target project '{matching_target_projects[0].name}' with ID: {target_project_id}")
-            
-            # If target project not specified at all, use same structure as source
-            if not target_project_id and not args.target_project_name:
-                source_project = migrator.source_server.projects.get_by_id(source_project_id)
-                target_project = migrator.ensure_project_exists(source_project.name)
-                target_project_id = target_project.id
-            # If target project specified by name but not found, create it
-            elif not target_project_id and args.target_project_name:
-                target_project = migrator.ensure_project_exists(args.target_project_name)
-                target_project_id = target_project.id
-                
-            migrator.migrate_workbook(workbook_id, source_project_id, target_project_id)
-        
-        elif args.migrate_project:
-            migrator.connect_to_source()
-            migrator.connect_to_target()
-            migrator.migrate_project(args.migrate_project, args.target_project_id)
-        
-        elif args.migrate_site:
-            migrator.migrate_site()
-    
-    finally:
-        # Only clean up source server for listing operations
-        if args.list_sites or args.list_projects or args.list_workbooks:
-            if migrator.source_server:
-                migrator.source_server.auth.sign_out()
-                migrator.logger.info("Signed out of source server") 
-        else:
-            # Full cleanup for migration operations
-            migrator.cleanup()
-
-
-if __name__ == "__main__":
-    main()  
+#!/usr/bin/env python3
+"""
+Tableau Server Migration Tool
+
+This script allows migrating workbooks from one Tableau server to another,
+supporting different sites and folder structures.
+"""
+
+import os
+import sys
+import argparse
+import asyncio
+import xml.etree.ElementTree as ET
+import functools
+import getpass
+import hashlib
+import logging
+import queue
+import random
+import shelve
+import shutil
+import tempfile
+import threading
+import time
+import requests
+import tableauserverclient as TSC
+from requests.adapters import HTTPAdapter, Retry
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import re
+
+# Add dotenv support for reading environment variables
+try:
+    from dotenv import load_dotenv
+    DOTENV_AVAILABLE = True
+except ImportError:
+    DOTENV_AVAILABLE = False
+
+# RequestFactory is needed to drive the chunked fileuploads endpoint directly;
+# its import path is internal to TSC, so degrade gracefully if it moves
+try:
+    from tableauserverclient.server import RequestFactory
+except ImportError:
+    RequestFactory = None
+
+# httpx powers the optional asyncio metadata client; listings fall back to
+# TSC's synchronous Pager when it isn't installed
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# tqdm renders one shared progress bar across the parallel workers; plain
+# logging is used when it isn't installed
+try:
+    from tqdm import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
+# Compiled once; strips characters that might cause filesystem issues
+_SAFE_FILENAME_RE = re.compile(r'[^\w\-_.]')
+
+
+def _is_retryable(error):
+    """Whether an error is transient enough to be worth retrying"""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, TSC.ServerResponseError):
+        # Tableau error codes embed the HTTP status in the leading digits
+        code = str(getattr(error, 'code', ''))
+        return code.startswith('429') or code.startswith('5')
+    return False
+
+
+def _with_retries(func):
+    """Retry a network-bound method with jittered exponential backoff
+
+    A single transient 429/5xx or dropped connection shouldn't abort a whole
+    site migration. The transport-level retries in _tune_session cover
+    requests that never got a response; this covers failures surfacing as
+    exceptions from a whole call, backing off up to six attempts.
+    """
+    max_attempts = 6
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        delay = 1.0
+        for attempt in range(1, max_attempts + 1):
+            try:
+                return func(self, *args, **kwargs)
+            except Exception as e:
+                if attempt == max_attempts or not _is_retryable(e):
+                    raise
+                wait = min(delay, 30.0) * (0.5 + random.random())
+                self.logger.warning("%s failed (attempt %s/%s), retrying in %.1fs: %s",
+                                    func.__name__, attempt, max_attempts, wait, str(e))
+                time.sleep(wait)
+                delay *= 2
+    return wrapper
+
+
+def _disk_cached(func):
+    """Serve repeated listing calls from the on-disk metadata cache
+
+    Planning sessions tend to run the --list-* commands over and over; this
+    lets successive invocations answer from local disk while the entry is
+    younger than --cache-ttl instead of re-hitting the server every time.
+    Callers that act on the results rather than display them (the migration
+    paths) pass use_cache=False to always fetch live metadata.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        use_cache = kwargs.pop('use_cache', True)
+        if not use_cache:
+            return func(self, *args, **kwargs)
+        key = self._cache_key(func.__name__, args, kwargs)
+        if key is not None:
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+        result = func(self, *args, **kwargs)
+        if key is not None and result:
+            self._cache_put(key, result)
+        return result
+    return wrapper
+
+
+class AsyncTableauClient:
+    """Asyncio client for the bulk metadata listings used during discovery
+
+    Reuses the auth token from an already signed-in TSC Server and fetches
+    listing pages concurrently with httpx: page 1 reveals totalAvailable, and
+    the remaining pages are gathered together instead of one blocking request
+    per page. Responses are parsed with TSC's own item classes, so callers
+    get the same objects Pager would yield. Byte-heavy download/upload work
+    stays on the thread pools - only cheap, high-fan-out metadata calls go
+    through here.
+    """
+
+    PAGE_SIZE = 1000
+    XML_NS = {"t": "http://tableau.com/api"}
+
+    def __init__(self, server, verify_ssl=True, max_connections=100):
+        # Capture everything needed from the signed-in Server up front so the
+        # async side never touches TSC's session state
+        self.baseurl = f"{server.server_address}/api/{server.version}"
+        self.site_luid = server.site_id
+        self.auth_token = server.auth_token
+        self.namespace = server.namespace
+        self.verify_ssl = verify_ssl
+        self.max_connections = max_connections
+
+    def list_projects(self):
+        pages = asyncio.run(self._get_pages("projects"))
+        projects = []
+        for page in pages:
+            projects.extend(TSC.ProjectItem.from_response(page, self.namespace))
+        return projects
+
+    def list_workbooks(self):
+        pages = asyncio.run(self._get_pages("workbooks"))
+        workbooks = []
+        for page in pages:
+            workbooks.extend(TSC.WorkbookItem.from_response(page, self.namespace))
+        return workbooks
+
+    async def _get_pages(self, resource):
+        url = f"{self.baseurl}/sites/{self.site_luid}/{resource}"
+        headers = {"X-Tableau-Auth": self.auth_token}
+        limits = httpx.Limits(max_connections=self.max_connections)
+
+        async with httpx.AsyncClient(headers=headers, verify=self.verify_ssl,
+                                     limits=limits, timeout=60.0) as client:
+            first = await self._get_page(client, url, 1)
+            total = self._total_available(first)
+            page_count = -(-total // self.PAGE_SIZE)
+            if page_count <= 1:
+                return [first]
+
+            rest = await asyncio.gather(*(self._get_page(client, url, page_number)
+                                          for page_number in range(2, page_count + 1)))
+            return [first] + list(rest)
+
+    async def _get_page(self, client, url, page_number):
+        # fields=_all_ expands every attribute in the listing itself, so
+        # downstream reads (updated_at, size, owner) never need a per-item
+        # populate round-trip
+        response = await client.get(url, params={"pageSize": self.PAGE_SIZE,
+                                                 "pageNumber": page_number,
+                                                 "fields": "_all_"})
+        response.raise_for_status()
+        return response.content
+
+    @classmethod
+    def _total_available(cls, page_content):
+        pagination = ET.fromstring(page_content).find("t:pagination", cls.XML_NS)
+        if pagination is None:
+            return 0
+        return int(pagination.get("totalAvailable", "0"))
+
+
+class TableauMigrator:
+    # Workbooks at or above this size go through the chunked upload endpoint
+    CHUNKED_UPLOAD_THRESHOLD = 64 * 1024 * 1024
+
+    # On-disk cache of listing results, shared across runs
+    CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "tableau_migrator")
+
+    def __init__(self, source_server, target_server, source_site, target_site,
+                 logger=None, source_token_name=None, source_token_value=None,
+                 target_token_name=None, target_token_value=None,
+                 source_username=None, source_password=None,
+                 target_username=None, target_password=None,
+                 verify_ssl=True, api_version=None, download_dir=None,
+                 include_extract=False, skip_data_sources=False, parallelism=8,
+                 part_size=8, force=False, cache_ttl=300, refresh_cache=False):
+        
+        self.source_server_url = source_server
+        self.target_server_url = target_server
+        self.source_site = source_site
+        self.target_site = target_site
+        self.api_version = api_version
+        self.include_extract = include_extract
+        self.skip_data_sources = skip_data_sources
+        self.parallelism = max(1, parallelism)
+        self.part_size = max(1, part_size)
+        self.force = force
+        self.cache_ttl = cache_ttl
+        self.refresh_cache = refresh_cache
+        self._cache_lock = threading.Lock()
+
+        # Authentication info
+        self.source_token_name = source_token_name
+        self.source_token_value = source_token_value
+        self.target_token_name = target_token_name
+        self.target_token_value = target_token_value
+        self.source_username = source_username
+        self.source_password = source_password
+        self.target_username = target_username
+        self.target_password = target_password
+        
+        # SSL verification
+        self.verify_ssl = verify_ssl
+        if not verify_ssl:
+            import urllib3
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            logger.warning("SSL certificate verification is disabled. This is insecure.")
+        
+        # Server connections
+        self.source_server = None
+        self.target_server = None
+
+        # One signed-in Server per (role, site): switching sites in place
+        # costs a round-trip and invalidates the previous token, so crossing
+        # between sites dispatches to a cached connection instead
+        self._servers_by_site = {}
+        self._active_site = {'source': source_site, 'target': target_site}
+
+        # Cache of target projects keyed by (parent_id, name), populated
+        # lazily by ensure_project_exists
+        self._target_project_cache = None
+
+        # Index of target workbooks keyed by (project_id, name), used to skip
+        # workbooks the target already has an up-to-date copy of
+        self._target_workbook_index = None
+
+        # Worker pools for parallel workbook transfers: downloads and uploads
+        # run in separate pools connected by a bounded queue (see
+        # migrate_project) so both network directions stay busy at once.
+        # tableauserverclient's Server is not safe to share across threads
+        # (shared session state), so each worker thread signs in its own
+        # connection on first use.
+        self.executor = ThreadPoolExecutor(max_workers=self.parallelism)
+        self.upload_executor = ThreadPoolExecutor(max_workers=self.parallelism)
+        self._thread_local = threading.local()
+        self._worker_servers = []
+        self._worker_servers_lock = threading.Lock()
+        
+        # Set up logging
+        if logger:
+            self.logger = logger
+        else:
+            self.logger = logging.getLogger('tableau_migrator')
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            self.logger.addHandler(handler)
+            self.logger.setLevel(logging.INFO)
+        
+        # Download directory - created lazily on first use (see
+        # _ensure_temp_dir) so pure listing runs never touch the filesystem
+        self.download_dir = download_dir
+        self.temp_dir = None
+        self.should_delete_temp_dir = download_dir is None
+        self._temp_dir_lock = threading.Lock()
+
+    def connect_to_source(self):
+        """Connect to the source Tableau server"""
+        return self._connect('source')
+
+    def connect_to_target(self):
+        """Connect to the target Tableau server"""
+        return self._connect('target')
+
+    @_with_retries
+    def _connect(self, role):
+        """Sign in the primary connection for a role ('source' or 'target')
+
+        Single change point for connection behavior - session tuning, API
+        version handling and auth all attach here instead of being kept in
+        sync across two copy-pasted methods.
+        """
+        server_url = getattr(self, f"{role}_server_url")
+        site = getattr(self, f"{role}_site")
+        self.logger.info(f"Connecting to {role} server: {server_url}, site: {site}")
+
+        auth = self._build_auth(role)
+        if isinstance(auth, TSC.PersonalAccessTokenAuth):
+            self.logger.info(f"Using token authentication for {role} server")
+        else:
+            self.logger.info(f"Using username/password authentication for {role} server")
+
+        server = self._build_server(role)
+        server.auth.sign_in(auth)
+
+        setattr(self, f"{role}_server", server)
+        self._servers_by_site[(role, self._active_site[role])] = server
+        self._register_thread_server(role, server)
+        self.logger.info(f"Successfully connected to {role} server")
+        return server
+
+    def _build_server(self, role):
+        """Construct a tuned TSC.Server for a role (not yet signed in)"""
+        server_url = getattr(self, f"{role}_server_url")
+
+        # Use auto-detect if no version is specified
+        use_server_version = True if self.api_version is None else False
+
+        server = TSC.Server(server_url, use_server_version=use_server_version,
+                            http_options={"verify": self.verify_ssl})
+        # Tag the connection with its role so _server_role doesn't have to
+        # guess from object identity
+        server._migrator_role = role
+        self._tune_session(server)
+
+        # Set API version if specified
+        if self.api_version:
+            server.version = self.api_version
+            self.logger.info(f"Using API version: {self.api_version}")
+
+        return server
+
+    def _tune_session(self, server):
+        """Enlarge the connection pool and add transport-level retries on a Server
+
+        requests' default pool (10 connections per host) becomes a hard cap on
+        parallel transfers to one server; a larger keep-alive pool lets the
+        worker threads reuse TLS connections instead of queueing on them.
+        Transient 429/5xx responses get a backed-off retry at the adapter level.
+        """
+        session = getattr(server, "session", None) or getattr(server, "_session", None)
+        if session is None or not hasattr(session, "mount"):
+            self.logger.warning("Could not access the server session to tune connection pooling")
+            return
+
+        try:
+            retries = Retry(total=5, backoff_factor=0.5,
+                            status_forcelist=[429, 500, 502, 503, 504],
+                            allowed_methods=frozenset(['GET', 'PUT', 'POST', 'DELETE']))
+        except TypeError:
+            # Older urllib3 releases spell the option method_whitelist
+            retries = Retry(total=5, backoff_factor=0.5,
+                            status_forcelist=[429, 500, 502, 503, 504],
+                            method_whitelist=frozenset(['GET', 'PUT', 'POST', 'DELETE']))
+
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64, max_retries=retries)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+    def _build_auth(self, role, site=None):
+        """Build a TSC auth object for the given role ('source' or 'target')"""
+        token_name = getattr(self, f"{role}_token_name")
+        token_value = getattr(self, f"{role}_token_value")
+        username = getattr(self, f"{role}_username")
+        password = getattr(self, f"{role}_password")
+        if site is None:
+            site = self._active_site[role]
+
+        if token_name and token_value:
+            return TSC.PersonalAccessTokenAuth(
+                token_name=token_name,
+                personal_access_token=token_value,
+                site_id=site
+            )
+        elif username:
+            if not password:
+                password = getpass.getpass(f"{role.capitalize()} Server Password: ")
+                setattr(self, f"{role}_password", password)
+            return TSC.TableauAuth(username, password, site_id=site)
+        else:
+            raise ValueError(f"No authentication credentials provided for {role} server")
+
+    def _register_thread_server(self, role, server):
+        """Record a signed-in server as the current thread's connection for a role"""
+        servers = getattr(self._thread_local, "servers", None)
+        if servers is None:
+            servers = self._thread_local.servers = {}
+        servers[(role, self._active_site[role])] = server
+
+    def _get_thread_server(self, role):
+        """Return a signed-in Server bound to the current thread
+
+        The main thread reuses the primary connection made by connect_to_source /
+        connect_to_target; worker threads sign in their own connection on first
+        use since TSC's Server shares session state and is not thread-safe.
+        Connections are keyed by (role, active site): pooled executor threads
+        outlive a single migration, and one that signed in during an earlier
+        run must not reuse that connection after the active site changed -
+        workbook LUIDs are site-scoped, so every call would 404.
+        """
+        servers = getattr(self._thread_local, "servers", None)
+        if servers is None:
+            servers = self._thread_local.servers = {}
+
+        site = self._active_site[role]
+        server = servers.get((role, site))
+        if server is None:
+            self.logger.info("Signing in %s server connection for thread %s", role, threading.current_thread().name)
+            server = self._build_server(role)
+            server.auth.sign_in(self._build_auth(role, site))
+            servers[(role, site)] = server
+            with self._worker_servers_lock:
+                self._worker_servers.append(server)
+        return server
+
+    def _server_role(self, server):
+        """Return the role ('source' or 'target') a Server was built for
+
+        Every Server is tagged with its role in _build_server; identity
+        checks against the primaries would misclassify cached per-site
+        connections (e.g. a per-site target server is not self.target_server).
+        """
+        role = getattr(server, '_migrator_role', None)
+        if role is None:
+            # Server created outside _build_server (tests, direct use)
+            role = 'target' if server is self.target_server else 'source'
+        return role
+
+    def _get_server_for_site(self, role, site):
+        """Return a signed-in Server for a role on a specific site
+
+        switch_site re-authenticates in place, costing a sign-in round-trip
+        and invalidating the token every time a call crosses sites. Keeping
+        one authenticated connection per site means each site pays that cost
+        once; later calls reuse the cached connection. The requested site
+        becomes the active one, so worker threads signing in afterwards land
+        on it too. Every connection made here is signed out in cleanup().
+        """
+        server = self._servers_by_site.get((role, site))
+        if server is None:
+            self.logger.info(f"Signing in {role} server connection for site {site}")
+            server = self._build_server(role)
+            server.auth.sign_in(self._build_auth(role, site))
+            self._servers_by_site[(role, site)] = server
+        if role == 'target' and self._active_site['target'] != site:
+            # Project LUIDs and workbook metadata are site-scoped, so the
+            # find-or-create and skip caches from the previous target site
+            # must not answer for this one
+            self._target_project_cache = None
+            self._target_workbook_index = None
+        self._active_site[role] = site
+        self._register_thread_server(role, server)
+        return server
+
+    def _cache_key(self, name, args, kwargs):
+        """Build a stable cache key for a listing call, or None when caching is off"""
+        if self.cache_ttl <= 0:
+            return None
+
+        parts = [name]
+        saw_server = False
+        for arg in args:
+            address = getattr(arg, 'server_address', None)
+            if address is not None:
+                # Key Server arguments by where they point, not object identity
+                saw_server = True
+                try:
+                    site = arg.site_id or ''
+                except Exception:
+                    site = ''
+                parts.extend([address, site])
+            else:
+                parts.append(repr(arg))
+        if not saw_server:
+            # Methods like list_source_sites take no Server argument; key them
+            # by the source connection so one server's cached listing can't
+            # answer for another
+            parts.extend([self.source_server_url or '', self._active_site['source'] or ''])
+        parts.append(repr(sorted(kwargs.items())))
+
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+    def _cache_get(self, key):
+        with self._cache_lock:
+            try:
+                os.makedirs(self.CACHE_DIR, exist_ok=True)
+                with shelve.open(os.path.join(self.CACHE_DIR, "listings")) as store:
+                    entry = store.get(key)
+            except Exception as e:
+                self.logger.debug(f"Cache read failed: {str(e)}")
+                return None
+
+        if not entry:
+            return None
+
+        stored_at, value = entry
+        age = time.time() - stored_at
+        if self.refresh_cache or age > self.cache_ttl:
+            return None
+
+        self.logger.info(f"Using listing cached {int(age)}s ago (use --refresh-cache to refetch)")
+        return value
+
+    def _cache_put(self, key, value):
+        with self._cache_lock:
+            try:
+                os.makedirs(self.CACHE_DIR, exist_ok=True)
+                with shelve.open(os.path.join(self.CACHE_DIR, "listings")) as store:
+                    store[key] = (time.time(), value)
+            except Exception as e:
+                self.logger.debug(f"Cache write failed: {str(e)}")
+
+    @classmethod
+    def drop_cache(cls):
+        """Delete the on-disk listing cache"""
+        shutil.rmtree(cls.CACHE_DIR, ignore_errors=True)
+
+    @_with_retries
+    def _list_all(self, server, resource):
+        """List every item of a resource ('projects' or 'workbooks') on a server
+
+        Uses the asyncio client to fetch listing pages concurrently when httpx
+        is installed, falling back to TSC's synchronous Pager otherwise.
+        Retried here so every caller is covered, including the bulk site-wide
+        listings that don't go through the decorated list_* methods.
+        """
+        if HTTPX_AVAILABLE:
+            try:
+                client = AsyncTableauClient(server, verify_ssl=self.verify_ssl)
+                if resource == 'projects':
+                    return client.list_projects()
+                if resource == 'workbooks':
+                    return client.list_workbooks()
+            except Exception as e:
+                self.logger.warning(f"Async metadata listing failed, falling back to Pager: {str(e)}")
+
+        # Large pages cut the number of pagination round-trips; where the
+        # installed TSC supports field selection, ask for every field up front
+        # so downstream reads never trigger a per-item populate call
+        req_options = TSC.RequestOptions(pagesize=1000)
+        fields = getattr(req_options, 'fields', None)
+        if fields is not None:
+            try:
+                fields.add('_all_')
+            except Exception:
+                pass
+
+        return list(TSC.Pager(getattr(server, resource), req_options))
+
+    @_disk_cached
+    @_with_retries
+    def list_source_sites(self):
+        """List all sites on the source server"""
+        if not self.source_server:
+            self.connect_to_source()
+        
+        all_sites = list(TSC.Pager(self.source_server.sites))
+        self.logger.info(f"Found {len(all_sites)} sites on source server")
+        return all_sites
+    
+    @_disk_cached
+    @_with_retries
+    def list_projects(self, server, site=None):
+        """List all projects on a server/site"""
+        if site and server.site_id != site:
+            # Use the cached connection for that site instead of switching
+            server = self._get_server_for_site(self._server_role(server), site)
+
+        all_projects = self._list_all(server, 'projects')
+        self.logger.info(f"Found {len(all_projects)} projects on site {server.site_id}")
+        return all_projects
+
+    @_disk_cached
+    @_with_retries
+    def list_workbooks(self, server, site=None, project_id=None):
+        """List all workbooks on a server/site, optionally filtered by project"""
+        if site and server.site_id != site:
+            # Use the cached connection for that site instead of switching
+            server = self._get_server_for_site(self._server_role(server), site)
+
+        try:
+            # Get all workbooks without any options that could trigger API compatibility issues
+            all_workbooks = self._list_all(server, 'workbooks')
+
+            self.logger.info("Retrieved %s total workbooks from site %s", len(all_workbooks), server.site_id)
+            
+            # Filter locally by project_id if needed
+            if project_id:
+                # Debug info: Log all project IDs to help troubleshoot
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    project_ids = set(wb.project_id for wb in all_workbooks)
+                    self.logger.debug("Available project IDs in workbooks: %s", project_ids)
+                    self.logger.debug("Looking for project ID: %s", project_id)
+                
+                # More flexible comparison - convert both to strings for comparison
+                filtered_workbooks = [wb for wb in all_workbooks 
+                                     if str(wb.project_id).lower() == str(project_id).lower()]
+                
+                self.logger.info("Filtered to %s workbooks in project %s", len(filtered_workbooks), project_id)
+                return filtered_workbooks
+            else:
+                return all_workbooks
+                
+        except Exception as e:
+            self.logger.error(f"Error listing workbooks: {str(e)}")
+            return []
+    
+    def _load_target_project_cache(self):
+        """Fetch all target projects once and index them by (parent_id, name)"""
+        self._target_project_cache = {}
+        for project in self._list_all(self.target_server, 'projects'):
+            self._target_project_cache[(project.parent_id, project.name)] = project
+        self.logger.info(f"Cached {len(self._target_project_cache)} projects from target server")
+
+    @_with_retries
+    def ensure_project_exists(self, project_name, parent_id=None):
+        """Make sure a project exists on the target server, create if it doesn't
+
+        Target projects are listed once and cached by (parent_id, name), so
+        repeated calls (one per project during a site migration) cost a dict
+        lookup instead of a filtered REST query each.
+        """
+        if self._target_project_cache is None:
+            self._load_target_project_cache()
+
+        key = (parent_id, project_name)
+        project = self._target_project_cache.get(key)
+        if project is not None:
+            self.logger.info("Found existing project: %s", project_name)
+            return project
+
+        # Create the project if it doesn't exist, and remember it
+        new_project = TSC.ProjectItem(name=project_name, parent_id=parent_id)
+        new_project = self.target_server.projects.create(new_project)
+        self._target_project_cache[key] = new_project
+        self.logger.info("Created new project: %s", project_name)
+        return new_project
+    
+    def migrate_workbook(self, workbook, target_project_id):
+        """Migrate a single workbook from source to target
+
+        This is a copy operation - workbooks are copied to the target server
+        but remain intact on the source server.
+
+        Accepts an already-fetched WorkbookItem so callers that listed the
+        workbooks (e.g. migrate_project) don't trigger a redundant get_by_id
+        round-trip per workbook.
+        """
+        if not self.source_server:
+            self.connect_to_source()
+        if not self.target_server:
+            self.connect_to_target()
+
+        # Use connections bound to the current thread so parallel workers
+        # don't share TSC session state
+        source_server = self._get_thread_server('source')
+        target_server = self._get_thread_server('target')
+
+        workbook_id = workbook.id
+        self.logger.debug("Migrating workbook: %s (ID: %s)", workbook.name, workbook_id)
+
+        if not self.force and self._target_workbook_index is None:
+            self._load_target_workbook_index()
+        if self._should_skip_workbook(workbook, target_project_id):
+            self.logger.info("Workbook %s is already up to date on target, "
+                             "skipping (use --force to republish)", workbook.name)
+            return
+
+        buffer = None
+        try:
+            buffer = self._download_workbook_to_buffer(source_server, workbook)
+            self._upload_workbook_buffer(target_server, workbook, buffer, target_project_id)
+        except Exception as e:
+            self.logger.error("Migration failed: %s", str(e))
+            raise
+        finally:
+            if buffer is not None:
+                buffer.close()
+
+    def _resolve_target_project_id(self, source_project_id, target_project_id=None,
+                                   target_project_name=None):
+        """Work out which target project a single-workbook migration publishes to"""
+        if target_project_id:
+            return target_project_id
+
+        if target_project_name:
+            project = self._find_project_by_name(self.target_server, target_project_name)
+            if project is not None:
+                self.logger.info(f"Found target project '{project.name}' with ID: {project.id}")
+                return project.id
+            self.logger.info(f"No target project found with name: {target_project_name}. Will create it.")
+            return self.ensure_project_exists(target_project_name).id
+
+        # No target specified at all - mirror the source project's name
+        source_project = self.source_server.projects.get_by_id(source_project_id)
+        return self.ensure_project_exists(source_project.name).id
+
+    def migrate_workbook_by_id(self, workbook_id, source_project_id, target_project_id=None,
+                               target_project_name=None):
+        """Migrate a single workbook known only by its ID
+
+        The source workbook fetch and the target project resolution are
+        independent round-trips against different servers, so they run
+        concurrently on the worker pool before any bytes move - saving one
+        serial round-trip on the critical path.
+        """
+        if not self.source_server:
+            self.connect_to_source()
+        if not self.target_server:
+            self.connect_to_target()
+
+        workbook_future = self.executor.submit(self.source_server.workbooks.get_by_id, workbook_id)
+        target_future = self.executor.submit(self._resolve_target_project_id, source_project_id,
+                                             target_project_id, target_project_name)
+
+        workbook = workbook_future.result()
+        self.logger.info(f"Found workbook '{workbook.name}' with ID: {workbook.id}")
+        resolved_target_id = target_future.result()
+
+        return self.migrate_workbook(workbook, resolved_target_id)
+
+    @_with_retries
+    def _upload_workbook_buffer(self, target_server, workbook, buffer, target_project_id):
+        """Publish a downloaded workbook buffer to the target project"""
+        # Create a new workbook item with the target project id
+        new_workbook = TSC.WorkbookItem(project_id=target_project_id, name=workbook.name)
+
+        # Upload to target straight from the buffer - the workbook bytes
+        # never make a round-trip through the local filesystem
+        self.logger.debug("Uploading workbook %s to target project %s", workbook.name, target_project_id)
+
+        # Check for older version of tableauserverclient
+        if self.skip_data_sources:
+            self.logger.info("Publishing without data source connections (--skip-data-sources enabled)")
+
+            # For older versions, we can't disable connections, so we'll just publish normally
+            # and warn the user
+            self.logger.warning("Your version of tableauserverclient doesn't support skipping data sources.")
+            self.logger.warning("The workbook will be published with data connections.")
+            self.logger.warning("If this fails due to permissions, you'll need to update tableauserverclient:")
+            self.logger.warning("pip install tableauserverclient --upgrade")
+
+        try:
+            # Try with CreateNew instead of Overwrite if there are issues
+            publish_mode = TSC.Server.PublishMode.Overwrite
+            self.logger.debug("Publishing with mode: %s", publish_mode)
+
+            self._publish_workbook(target_server, new_workbook, buffer, publish_mode)
+
+            self.logger.debug("Successfully migrated workbook %s", workbook.name)
+        except Exception as upload_error:
+            self.logger.error("Error publishing workbook: %s", str(upload_error))
+            self.logger.error("Target project exists: %s", target_project_id)
+
+            # Try with different publish mode
+            try:
+                self.logger.info("Trying alternative publish mode...")
+                publish_mode = TSC.Server.PublishMode.CreateNew
+                self.logger.info("Publishing with mode: %s", publish_mode)
+
+                self._publish_workbook(target_server, new_workbook, buffer, publish_mode)
+
+                self.logger.debug("Successfully migrated workbook %s with alternative mode", workbook.name)
+            except Exception as retry_error:
+                self.logger.error("Alternative publish mode also failed: %s", str(retry_error))
+                raise
+
+    def _load_target_workbook_index(self):
+        """Fetch all target workbooks once and index them by (project_id, name)"""
+        self._target_workbook_index = {}
+        for workbook in self._list_all(self.target_server, 'workbooks'):
+            self._target_workbook_index[(workbook.project_id, workbook.name)] = workbook
+        self.logger.info(f"Indexed {len(self._target_workbook_index)} workbooks on target server")
+
+    def _should_skip_workbook(self, workbook, target_project_id):
+        """Return True if the target already has an up-to-date copy of a workbook
+
+        An existing target workbook with the same project and name counts as
+        up to date when it was updated at or after the source copy (and sizes
+        match where both report one). --force bypasses the check entirely.
+        """
+        if self.force or self._target_workbook_index is None:
+            return False
+
+        existing = self._target_workbook_index.get((target_project_id, workbook.name))
+        if existing is None:
+            return False
+
+        source_updated = getattr(workbook, 'updated_at', None)
+        target_updated = getattr(existing, 'updated_at', None)
+        if not source_updated or not target_updated:
+            return False
+
+        try:
+            if target_updated < source_updated:
+                return False
+        except TypeError:
+            return False
+
+        # Cheap byte-level sanity check when both sides report a size
+        source_size = getattr(workbook, 'size', None)
+        target_size = getattr(existing, 'size', None)
+        if source_size is not None and target_size is not None and source_size != target_size:
+            return False
+
+        return True
+
+    def _publish_workbook(self, target_server, new_workbook, buffer, publish_mode):
+        """Publish a workbook buffer, using chunked upload for large files"""
+        buffer.seek(0, os.SEEK_END)
+        size = buffer.tell()
+        buffer.seek(0)
+
+        if size >= self.CHUNKED_UPLOAD_THRESHOLD and RequestFactory is not None:
+            try:
+                return self._publish_workbook_chunked(target_server, new_workbook, buffer,
+                                                      publish_mode, size)
+            except Exception as chunked_err:
+                self.logger.warning("Chunked upload failed, falling back to single-request publish: %s", str(chunked_err))
+                buffer.seek(0)
+
+        return target_server.workbooks.publish(new_workbook, buffer, publish_mode)
+
+    def _publish_workbook_chunked(self, target_server, new_workbook, buffer, publish_mode, size):
+        """Push a large workbook through Tableau's fileuploads session API
+
+        One monolithic PUT for a multi-GB .twbx stalls on a single TCP
+        window and has to restart from zero on any failure. Splitting into
+        --part-size chunks bounds each request and lets the transport-level
+        retries (see _tune_session) recover per chunk. The REST API requires
+        chunks within a session to be appended in order, so parts are sent
+        sequentially.
+        """
+        part_size = self.part_size * 1024 * 1024
+        upload_id = target_server.fileuploads.initiate()
+        self.logger.info("Uploading %s bytes in %sMB chunks (session %s)", size, self.part_size, upload_id)
+
+        sent = 0
+        while True:
+            chunk = buffer.read(part_size)
+            if not chunk:
+                break
+            data, content_type = RequestFactory.Fileupload.chunk_req(chunk)
+            target_server.fileuploads.append(upload_id, data, content_type)
+            sent += len(chunk)
+            self.logger.debug("Uploaded %s/%s bytes", sent, size)
+
+        # Commit the upload session as a workbook publish
+        buffer.seek(0)
+        workbook_type = 'twbx' if buffer.read(2) == b'PK' else 'twb'
+        overwrite = 'true' if publish_mode == TSC.Server.PublishMode.Overwrite else 'false'
+        url = (f"{target_server.workbooks.baseurl}?uploadSessionId={upload_id}"
+               f"&workbookType={workbook_type}&overwrite={overwrite}")
+        xml_request, content_type = RequestFactory.Workbook.publish_req_xml(new_workbook)
+        target_server.workbooks.post_request(url, xml_request, content_type)
+
+    def _ensure_temp_dir(self):
+        """Create the download directory on first use and return a per-thread subdir
+
+        Deferred out of __init__ so listing-only runs never create one. Each
+        worker thread writes under its own subdirectory, so parallel fallback
+        downloads can't collide on filenames.
+        """
+        with self._temp_dir_lock:
+            if self.temp_dir is None:
+                if self.download_dir:
+                    self.temp_dir = self.download_dir
+                    if not os.path.exists(self.temp_dir):
+                        os.makedirs(self.temp_dir)
+                        self.logger.info(f"Created download directory: {self.temp_dir}")
+                    else:
+                        self.logger.info(f"Using existing download directory: {self.temp_dir}")
+                else:
+                    self.temp_dir = tempfile.mkdtemp()
+                    self.logger.info(f"Created temporary directory: {self.temp_dir}")
+
+        thread_dir = os.path.join(self.temp_dir,
+                                  _SAFE_FILENAME_RE.sub('_', threading.current_thread().name))
+        os.makedirs(thread_dir, exist_ok=True)
+        return thread_dir
+
+    @_with_retries
+    def _download_workbook_to_buffer(self, source_server, workbook):
+        """Download a workbook's bytes into a seekable in-memory buffer
+
+        Streams the HTTP response body straight into a SpooledTemporaryFile,
+        which stays in RAM for typical workbook sizes and transparently spills
+        to disk for very large ones. Falls back to a regular file download if
+        the streaming endpoint misbehaves.
+        """
+        buffer = tempfile.SpooledTemporaryFile(max_size=256 * 1024 * 1024)
+
+        # Same endpoint TSC's own download() uses, minus the filesystem stop
+        url = f"{source_server.workbooks.baseurl}/{workbook.id}/content"
+        if not self.include_extract:
+            url += "?includeExtract=False"
+
+        streamed = True
+        try:
+            self.logger.debug("Streaming workbook %s from source server", workbook.id)
+            response = source_server.workbooks.get_request(url, parameters={"stream": True})
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                buffer.write(chunk)
+        except Exception as stream_err:
+            self.logger.warning("Streaming download failed, falling back to file download: %s", str(stream_err))
+            streamed = False
+            buffer.seek(0)
+            buffer.truncate()
+
+            # Create safe filenames without characters that might cause issues
+            safe_filename = _SAFE_FILENAME_RE.sub('_', f"workbook_{workbook.id}")
+            workbook_file = os.path.join(self._ensure_temp_dir(), f"{safe_filename}.twbx")
+
+            try:
+                workbook_file = source_server.workbooks.download(workbook.id, workbook_file,
+                                                                 include_extract=self.include_extract)
+            except TypeError:
+                # Older versions of TSC might not support the include_extract parameter
+                self.logger.info("Trying download without extra parameters")
+                workbook_file = source_server.workbooks.download(workbook.id, workbook_file)
+
+            with open(workbook_file, 'rb') as downloaded:
+                shutil.copyfileobj(downloaded, buffer)
+            # No per-file unlink: cleanup() removes the whole temp dir in one
+            # rmtree, and a user-supplied download dir keeps its files anyway
+
+        size = buffer.tell()
+        if size == 0:
+            raise FileNotFoundError(f"Downloaded workbook {workbook.id} is empty")
+
+        # An explicit --download-dir means the user wants the files kept;
+        # the fallback path above already wrote one there
+        if streamed and self.download_dir:
+            self._save_download_copy(buffer, workbook)
+
+        self.logger.debug("Downloaded workbook %s: %s bytes", workbook.name, size)
+        buffer.seek(0)
+        return buffer
+
+    def _save_download_copy(self, buffer, workbook):
+        """Write a copy of a downloaded workbook into the user's download dir"""
+        safe_filename = _SAFE_FILENAME_RE.sub('_', f"workbook_{workbook.id}")
+        try:
+            # Zip magic means a packaged workbook, plain XML otherwise - same
+            # sniff the chunked publish uses
+            buffer.seek(0)
+            extension = 'twbx' if buffer.read(2) == b'PK' else 'twb'
+            workbook_file = os.path.join(self._ensure_temp_dir(), f"{safe_filename}.{extension}")
+            buffer.seek(0)
+            with open(workbook_file, 'wb') as copy:
+                shutil.copyfileobj(buffer, copy)
+            self.logger.debug("Saved workbook copy to %s", workbook_file)
+        except Exception as e:
+            self.logger.warning(f"Could not save workbook copy for {workbook.name}: {str(e)}")
+    
+    def migrate_project(self, source_project_id, target_project_id=None, workbooks=None):
+        """Migrate all workbooks from a source project to a target project
+
+        This is a copy operation - all content remains intact on the source server.
+
+        Callers that already hold the project's workbooks (e.g. migrate_site's
+        bulk listing) can pass them in to skip the per-project filtered query.
+        """
+        if not self.source_server:
+            self.connect_to_source()
+        if not self.target_server:
+            self.connect_to_target()
+
+        # Get source project details
+        source_project = self.source_server.projects.get_by_id(source_project_id)
+
+        # If no target project ID is provided, create or find a matching project
+        if not target_project_id:
+            target_project = self.ensure_project_exists(source_project.name, source_project.parent_id)
+            target_project_id = target_project.id
+
+        # Get all workbooks in the source project unless the caller supplied
+        # them. Migrations act on the listing, so never serve it from cache:
+        # a workbook updated inside the TTL window must not be missed
+        if workbooks is None:
+            workbooks = self.list_workbooks(self.source_server, project_id=source_project_id,
+                                            use_cache=False)
+        
+        if not workbooks:
+            self.logger.info(f"No workbooks to migrate from project {source_project.name}")
+            return
+
+        # Index the target's workbooks up front (main thread) so workers can
+        # skip anything the target already has an up-to-date copy of
+        if not self.force and self._target_workbook_index is None:
+            self._load_target_workbook_index()
+
+        # Pipeline downloads and uploads through a bounded queue so the source
+        # and target links stay busy at the same time instead of each worker
+        # alternating download -> upload. The queue bound applies backpressure
+        # so downloaded buffers don't pile up in RAM faster than uploads drain
+        # them. Each worker thread signs in its own connection (see
+        # _get_thread_server).
+        pending = queue.Queue(maxsize=self.parallelism * 2)
+        errors = []
+        skipped = []
+        stats_lock = threading.Lock()
+
+        # One shared progress bar instead of a success log line per workbook:
+        # a single stderr write per completion, and no fighting over the
+        # logging mutex once many workers finish at once
+        pbar = None
+        if TQDM_AVAILABLE:
+            pbar = tqdm(total=len(workbooks), unit='wb', desc=f"Migrating {source_project.name}")
+
+        def advance():
+            if pbar is not None:
+                pbar.update(1)
+
+        def record_error(workbook, stage, error):
+            self.logger.error("Failed to %s workbook %s: %s", stage, workbook.name, str(error))
+            with stats_lock:
+                errors.append(error)
+            advance()
+
+        def download_stage(workbook):
+            if self._should_skip_workbook(workbook, target_project_id):
+                self.logger.debug("Workbook %s is already up to date on target, "
+                                  "skipping (use --force to republish)", workbook.name)
+                with stats_lock:
+                    skipped.append(workbook)
+                advance()
+                return
+            buffer = self._download_workbook_to_buffer(self._get_thread_server('source'), workbook)
+            pending.put((workbook, buffer))
+
+        def upload_stage():
+            while True:
+                item = pending.get()
+                if item is None:
+                    break
+                workbook, buffer = item
+                try:
+                    self._upload_workbook_buffer(self._get_thread_server('target'), workbook,
+                                                 buffer, target_project_id)
+                except Exception as e:
+                    record_error(workbook, "upload", e)
+                else:
+                    advance()
+                finally:
+                    buffer.close()
+
+        try:
+            uploaders = [self.upload_executor.submit(upload_stage) for _ in range(self.parallelism)]
+            downloads = {self.executor.submit(download_stage, workbook): workbook for workbook in workbooks}
+
+            try:
+                for future in as_completed(downloads):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        record_error(downloads[future], "download", e)
+            finally:
+                # Deliver the stop sentinels even when the loop above is
+                # interrupted (e.g. Ctrl-C) - without them the uploaders
+                # block in pending.get() forever and cleanup()'s executor
+                # shutdown deadlocks. Queued downloads are cancelled so they
+                # don't keep feeding a queue nobody drains.
+                for future in downloads:
+                    future.cancel()
+                for _ in uploaders:
+                    pending.put(None)
+
+            for future in uploaders:
+                future.result()
+        finally:
+            if pbar is not None:
+                pbar.close()
+
+        if errors:
+            raise RuntimeError(f"{len(errors)} of {len(workbooks)} workbooks failed to migrate "
+                               f"from project {source_project.name}")
+
+        migrated = len(workbooks) - len(skipped)
+        self.logger.info(f"Successfully migrated {migrated} workbooks from project {source_project.name} "
+                         f"({len(skipped)} already up to date)")
+    
+    def migrate_site(self, source_site_id=None, target_site_id=None):
+        """Migrate all projects and workbooks from a source site to a target site
+        
+        This is a copy operation - all content remains intact on the source server.
+        """
+        # Use current site if none specified
+        source_site_id = source_site_id or self.source_site
+        target_site_id = target_site_id or self.target_site
+        
+        # Ensure we're connected to both servers
+        if not self.source_server:
+            self.connect_to_source()
+        if not self.target_server:
+            self.connect_to_target()
+        
+        # Use cached per-site connections instead of switching in place
+        if self.source_server.site_id != source_site_id:
+            self.source_server = self._get_server_for_site('source', source_site_id)
+
+        if self.target_server.site_id != target_site_id:
+            self.target_server = self._get_server_for_site('target', target_site_id)
+        
+        # Get all projects in the source site, bypassing the listing cache -
+        # the migration must see the site as it is now, not as it was when a
+        # --list-* command last ran
+        source_projects = self.list_projects(self.source_server, use_cache=False)
+        
+        # Create project hierarchy mapping by walking the tree top-down:
+        # parents are always created before their children, so a single pass
+        # over a queue seeded with the root projects covers any depth
+        project_map = {}
+
+        children_of = defaultdict(list)
+        for project in source_projects:
+            children_of[project.parent_id].append(project)
+
+        pending = deque(children_of[None])
+        while pending:
+            project = pending.popleft()
+            target_parent_id = project_map.get(project.parent_id)
+            target_project = self.ensure_project_exists(project.name, target_parent_id)
+            project_map[project.id] = target_project.id
+            pending.extend(children_of[project.id])
+
+        if len(project_map) < len(source_projects):
+            # Any project not reached from a root has a missing/unknown parent
+            orphaned = len(source_projects) - len(project_map)
+            self.logger.error(f"Unable to create project hierarchy for {orphaned} projects")
+        
+        # Fetch every workbook on the site once and group by project locally,
+        # rather than issuing one filtered query per project
+        workbooks_by_project = defaultdict(list)
+        for workbook in self._list_all(self.source_server, 'workbooks'):
+            workbooks_by_project[workbook.project_id].append(workbook)
+        self.logger.info(f"Retrieved {sum(len(wbs) for wbs in workbooks_by_project.values())} workbooks "
+                         f"across {len(workbooks_by_project)} projects")
+
+        # Now migrate all projects
+        for source_project_id, target_project_id in project_map.items():
+            self.migrate_project(source_project_id, target_project_id,
+                                 workbooks=workbooks_by_project.get(source_project_id, []))
+        
+        self.logger.info(f"Successfully migrated site {source_site_id} to {target_site_id}")
+    
+    def cleanup(self):
+        """Clean up temporary files and sign out of servers"""
+        # Stop the worker pools and sign out any per-thread connections
+        self.executor.shutdown(wait=True)
+        self.upload_executor.shutdown(wait=True)
+        with self._worker_servers_lock:
+            worker_servers = list(self._worker_servers)
+            self._worker_servers = []
+        for server in worker_servers:
+            try:
+                server.auth.sign_out()
+                self.logger.info("Signed out worker connection")
+            except Exception as e:
+                self.logger.warning(f"Error signing out worker connection: {str(e)}")
+
+        # Clean up temp directory, if one was ever created
+        if self.temp_dir is None:
+            pass
+        elif self.should_delete_temp_dir:
+            try:
+                if os.path.exists(self.temp_dir):
+                    shutil.rmtree(self.temp_dir)
+                    self.logger.info(f"Removed temporary directory: {self.temp_dir}")
+            except Exception as e:
+                self.logger.warning(f"Error cleaning up temporary directory: {str(e)}")
+        else:
+            self.logger.info(f"Keeping download directory: {self.temp_dir}")
+        
+        # Sign out of every per-site connection (the primaries live in
+        # _servers_by_site too, registered when they signed in)
+        signed_out = set()
+        for (role, site), server in self._servers_by_site.items():
+            if server is None or id(server) in signed_out:
+                continue
+            signed_out.add(id(server))
+            try:
+                server.auth.sign_out()
+                self.logger.info(f"Signed out of {role} server (site: {site})")
+            except Exception as e:
+                self.logger.warning(f"Error signing out of {role} server (site: {site}): {str(e)}")
+        self._servers_by_site = {}
+
+    def _find_project_by_name(self, server, project_name):
+        """Return the first project matching a name (case insensitive), or None
+
+        Iterates the Pager and stops at the first hit instead of materializing
+        every project just to scan the full list afterwards.
+        """
+        wanted = project_name.lower()
+        for project in TSC.Pager(server.projects):
+            if project.name.lower() == wanted:
+                return project
+        return None
+
+    def list_workbooks_by_project_name(self, server, project_name, site=None):
+        """List all workbooks in a project identified by name"""
+        if site and server.site_id != site:
+            # Use the cached connection for that site instead of switching
+            server = self._get_server_for_site(self._server_role(server), site)
+
+        # Find the first project with a matching name, stopping the listing
+        # as soon as one turns up
+        try:
+            target_project = self._find_project_by_name(server, project_name)
+            if not target_project:
+                self.logger.error(f"No project found with name: {project_name}")
+                return []
+
+            self.logger.info(f"Found project '{target_project.name}' with ID: {target_project.id}")
+
+            # Now get workbooks for this project
+            return self.list_workbooks(server, site, target_project.id)
+
+        except Exception as e:
+            self.logger.error(f"Error listing workbooks by project name: {str(e)}")
+            return []
+
+    def find_workbook_by_name(self, server, workbook_name, project_id=None, site=None):
+        """Find a workbook by name, optionally filtered by project"""
+        if site and server.site_id != site:
+            # Use the cached connection for that site instead of switching
+            server = self._get_server_for_site(self._server_role(server), site)
+
+        try:
+            # Get all workbooks - fresh, since the lookup feeds a migration
+            all_workbooks = self.list_workbooks(server, project_id=project_id,
+                                                use_cache=False)
+
+            # Find workbooks with matching name (case insensitive)
+            matching_workbooks = [wb for wb in all_workbooks 
+                                if wb.name.lower() == workbook_name.lower()]
+            
+            if not matching_workbooks:
+                self.logger.warning(f"No workbook found with name: {workbook_name}")
+                if project_id:
+                    self.logger.info(f"Available workbooks in project {project_id}:")
+                    for wb in all_workbooks:
+                        self.logger.info(f"  - {wb.name} (ID: {wb.id})")
+                return None
+            
+            if len(matching_workbooks) > 1:
+                self.logger.warning(f"Multiple workbooks found with name: {workbook_name}. Using the first one.")
+            
+            target_workbook = matching_workbooks[0]
+            self.logger.info(f"Found workbook '{target_workbook.name}' with ID: {target_workbook.id}")
+            
+            return target_workbook
+            
+        except Exception as e:
+            self.logger.error(f"Error finding workbook by name: {str(e)}")
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate workbooks between Tableau servers")
+    
+    # Server connection options
+    parser.add_argument("--source-server", "-ss", 
+                        help="Source Tableau server URL (e.g., https://tableau.example.com)")
+    parser.add_argument("--target-server", "-ts", 
+                        help="Target Tableau server URL (e.g., https://tableau-target.example.com)")
+    parser.add_argument("--source-site", "-ssite", default="",
+                        help="Source site ID (use empty string for default site)")
+    parser.add_argument("--target-site", "-tsite", default="",
+                        help="Target site ID (use empty string for default site)")
+    parser.add_argument("--no-ssl-verify", action="store_true",
+                        help="Disable SSL certificate verification (insecure, but useful for self-signed certs)")
+    parser.add_argument("--api-version", 
+                        help="Specify Tableau Server REST API version (e.g., 3.4, 3.10)")
+    parser.add_argument("--download-dir",
+                        help="Keep a copy of every downloaded workbook in this directory "
+                             "(optional; without it downloads stream through memory)")
+    parser.add_argument("--include-extract", action="store_true",
+                        help="Include data extract when downloading workbooks (may make file larger)")
+    parser.add_argument("--skip-data-sources", action="store_true",
+                        help="Skip data source connections when publishing (helps with permission issues)")
+    parser.add_argument("--parallelism", type=int, default=8,
+                        help="Number of workbooks to migrate in parallel (default: 8)")
+    parser.add_argument("--part-size", type=int, default=8,
+                        help="Chunk size in MB for chunked uploads of large workbooks (default: 8)")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-publish workbooks even if the target already has an up-to-date copy")
+    parser.add_argument("--cache-ttl", type=int, default=300,
+                        help="Seconds to serve listing results from the on-disk cache (0 disables; default: 300)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the on-disk listing cache for this run")
+    parser.add_argument("--refresh-cache", action="store_true",
+                        help="Ignore existing cache entries and refetch from the server, updating the cache")
+    parser.add_argument("--drop-cache", action="store_true",
+                        help="Delete the on-disk listing cache; usable on its own or before another action")
+    parser.add_argument("--env-file", default=".env",
+                        help="Path to .env file for credentials (default: .env in current directory)")
+    
+    # Authentication options - Source
+    source_auth = parser.add_argument_group("Source Server Authentication")
+    source_auth_method = source_auth.add_mutually_exclusive_group(required=False)
+    source_auth_method.add_argument("--source-token-name", "-stn",
+                                  help="Name of personal access token for source server")
+    source_auth_method.add_argument("--source-username", "-su",
+                                  help="Username for source server")
+    source_auth.add_argument("--source-token-value", "-stv",
+                           help="Value of personal access token for source server")
+    source_auth.add_argument("--source-password", "-sp",
+                           help="Password for source server")
+    
+    # Authentication options - Target
+    target_auth = parser.add_argument_group("Target Server Authentication")
+    target_auth_method = target_auth.add_mutually_exclusive_group(required=False)
+    target_auth_method.add_argument("--target-token-name", "-ttn",
+                                  help="Name of personal access token for target server")
+    target_auth_method.add_argument("--target-username", "-tu",
+                                  help="Username for target server")
+    target_auth.add_argument("--target-token-value", "-ttv",
+                           help="Value of personal access token for target server")
+    target_auth.add_argument("--target-password", "-tp",
+                           help="Password for target server")
+    
+    # Action to perform. Not required=True at the argparse level so that
+    # --drop-cache can run on its own; the check happens after parsing
+    action = parser.add_argument_group("Migration Action")
+    action_type = action.add_mutually_exclusive_group(required=False)
+    action_type.add_argument("--list-sites", action="store_true",
+                           help="List available sites on source server")
+    action_type.add_argument("--list-projects", action="store_true",
+                           help="List available projects on source site")
+    action_type.add_argument("--list-workbooks", action="store_true",
+                           help="List available workbooks on source site")
+    action_type.add_argument("--migrate-workbook", "-mw",
+                           help="ID of workbook to migrate")
+    action_type.add_argument("--migrate-workbook-by-name", "-mwn",
+                           help="Name of workbook to migrate")
+    action_type.add_argument("--migrate-project", "-mp",
+                           help="ID of project to migrate")
+    action_type.add_argument("--migrate-site", action="store_true",
+                           help="Migrate entire site")
+    
+    # Additional options
+    parser.add_argument("--source-project-id", "-spid",
+                      help="Source project ID (for --list-workbooks or --migrate-workbook)")
+    parser.add_argument("--source-project-name", "-spname",
+                      help="Source project name (alternative to --source-project-id)")
+    parser.add_argument("--target-project-id", "-tpid",
+                      help="Target project ID (optional for --migrate-workbook and --migrate-project)")
+    parser.add_argument("--target-project-name", "-tpname",
+                      help="Target project name (alternative to --target-project-id)")
+    parser.add_argument("--verbosity", "-v", choices=["debug", "info", "warning", "error"],
+                      default="info", help="Logging verbosity")
+    
+    args = parser.parse_args()
+
+    # The listing cache is purely local, so dropping it needs no server or
+    # credentials - handle it before any validation, and on its own it's a
+    # complete run
+    if args.drop_cache:
+        TableauMigrator.drop_cache()
+        print("Dropped on-disk listing cache")
+
+    action_selected = (args.list_sites or args.list_projects or args.list_workbooks
+                       or args.migrate_workbook or args.migrate_workbook_by_name
+                       or args.migrate_project or args.migrate_site)
+    if not action_selected:
+        if args.drop_cache:
+            return
+        parser.error("one of the arguments --list-sites --list-projects --list-workbooks "
+                     "--migrate-workbook/-mw --migrate-workbook-by-name/-mwn "
+                     "--migrate-project/-mp --migrate-site --drop-cache is required")
+
+    # Load environment variables from .env file if available
+    if DOTENV_AVAILABLE:
+        env_file = args.env_file
+        if os.path.exists(env_file):
+            load_dotenv(env_file)
+            print(f"Loaded environment variables from {env_file}")
+        else:
+            print(f"Warning: Environment file {env_file} not found")
+    else:
+        print("Warning: python-dotenv not installed. Cannot load .env file.")
+        print("Install with: pip install python-dotenv")
+    
+    # Use arguments if provided, otherwise try environment variables
+    source_server = args.source_server or os.environ.get("TABLEAU_SOURCE_SERVER")
+    target_server = args.target_server or os.environ.get("TABLEAU_TARGET_SERVER")
+    source_site = args.source_site or os.environ.get("TABLEAU_SOURCE_SITE", "")
+    target_site = args.target_site or os.environ.get("TABLEAU_TARGET_SITE", "")
+    
+    # Source auth
+    source_token_name = args.source_token_name or os.environ.get("TABLEAU_SOURCE_TOKEN_NAME")
+    source_token_value = args.source_token_value or os.environ.get("TABLEAU_SOURCE_TOKEN_VALUE")
+    source_username = args.source_username or os.environ.get("TABLEAU_SOURCE_USERNAME")
+    source_password = args.source_password or os.environ.get("TABLEAU_SOURCE_PASSWORD")
+    
+    # Target auth
+    target_token_name = args.target_token_name or os.environ.get("TABLEAU_TARGET_TOKEN_NAME")
+    target_token_value = args.target_token_value or os.environ.get("TABLEAU_TARGET_TOKEN_VALUE")
+    target_username = args.target_username or os.environ.get("TABLEAU_TARGET_USERNAME")
+    target_password = args.target_password or os.environ.get("TABLEAU_TARGET_PASSWORD")
+    
+    # API Version
+    api_version = args.api_version or os.environ.get("TABLEAU_API_VERSION")
+    
+    # Validate required parameters
+    if not source_server:
+        parser.error("Source server must be provided via --source-server or TABLEAU_SOURCE_SERVER environment variable")
+    
+    # Source auth validation
+    if not (source_token_name or source_username):
+        parser.error("Source authentication must be provided via command line arguments or environment variables")
+    
+    # Target auth validation for migration operations
+    if (args.migrate_workbook or args.migrate_workbook_by_name or args.migrate_project or args.migrate_site):
+        if not target_server:
+            parser.error("Target server must be provided for migration operations")
+        if not (target_token_name or target_username):
+            parser.error("Target authentication must be provided for migration operations")
+    
+    # Check that target server is provided for migration operations
+    if (args.migrate_workbook or args.migrate_workbook_by_name or args.migrate_project or args.migrate_site) and not target_server:
+        parser.error("--target-server is required for migration operations")
+    
+    # Set up logging
+    logging_level = getattr(logging, args.verbosity.upper())
+    logger = logging.getLogger('tableau_migrator')
+    logger.setLevel(logging_level)
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    
+    # Create migrator
+    migrator = TableauMigrator(
+        source_server=source_server,
+        target_server=target_server,
+        source_site=source_site,
+        target_site=target_site,
+        logger=logger,
+        source_token_name=source_token_name,
+        source_token_value=source_token_value,
+        target_token_name=target_token_name,
+        target_token_value=target_token_value,
+        source_username=source_username,
+        source_password=source_password,
+        target_username=target_username,
+        target_password=target_password,
+        verify_ssl=not args.no_ssl_verify,
+        api_version=api_version,
+        download_dir=args.download_dir,
+        include_extract=args.include_extract,
+        skip_data_sources=args.skip_data_sources,
+        parallelism=args.parallelism,
+        part_size=args.part_size,
+        force=args.force,
+        cache_ttl=0 if args.no_cache else args.cache_ttl,
+        refresh_cache=args.refresh_cache
+    )
+    
+    try:
+        # Execute requested action
+        if args.list_sites:
+            sites = migrator.list_source_sites()
+            print("\nAvailable sites on source server:")
+            for site in sites:
+                print(f"  - {site.name} (ID: {site.id}, URL: {site.content_url})")
+        
+        elif args.list_projects:
+            migrator.connect_to_source()
+            projects = migrator.list_projects(migrator.source_server)
+            print("\nAvailable projects on source site:")
+            for project in projects:
+                parent = f" (Parent ID: {project.parent_id})" if project.parent_id else ""
+                print(f"  - {project.name} (ID: {project.id}){parent}")
+        
+        elif args.list_workbooks:
+            migrator.connect_to_source()
+            
+            # Get workbooks - either by project ID, project name, or all
+            if args.source_project_id:
+                workbooks = migrator.list_workbooks(migrator.source_server, 
+                                                  project_id=args.source_project_id)
+            elif args.source_project_name:
+                workbooks = migrator.list_workbooks_by_project_name(migrator.source_server,
+                                                                   args.source_project_name)
+            else:
+                workbooks = migrator.list_workbooks(migrator.source_server)
+            
+            print("\nAvailable workbooks:")
+            for workbook in workbooks:
+                # Print project ID to help with troubleshooting
+                print(f"  - {workbook.name} (ID: {workbook.id}, Project ID: {workbook.project_id})")
+        
+        elif args.migrate_workbook or args.migrate_workbook_by_name:
+            # For both workbook migration methods, we need a source project
+            if not args.source_project_id and not args.source_project_name:
+                logger.error("Either --source-project-id or --source-project-name is required when migrating a workbook")
+                sys.exit(1)
+                
+            migrator.connect_to_source()
+            migrator.connect_to_target()
+            
+            # Get source project ID - either directly provided or looked up by name
+            source_project_id = args.source_project_id
+            if not source_project_id and args.source_project_name:
+                # Find project by name, stopping at the first match
+                source_project = migrator._find_project_by_name(migrator.source_server,
+                                                                args.source_project_name)
+                if not source_project:
+                    logger.error(f"No project found with name: {args.source_project_name}")
+                    sys.exit(1)
+
+                source_project_id = source_project.id
+                logger.info(f"Found source project '{source_project.name}' with ID: {source_project_id}")
+            
+            if args.migrate_workbook:
+                # The workbook fetch and target project resolution run
+                # concurrently inside migrate_workbook_by_id
+                migrator.migrate_workbook_by_id(args.migrate_workbook, source_project_id,
+                                                target_project_id=args.target_project_id,
+                                                target_project_name=args.target_project_name)
+            else:
+                logger.info(f"Looking for workbook with name: {args.migrate_workbook_by_name}")
+                workbook = migrator.find_workbook_by_name(migrator.source_server,
+                                                         args.migrate_workbook_by_name,
+                                                         source_project_id)
+                if not workbook:
+                    logger.error(f"Could not find workbook with name: {args.migrate_workbook_by_name}")
+                    sys.exit(1)
+                logger.info(f"Found workbook '{workbook.name}' with ID: {workbook.id}")
+
+                target_project_id = migrator._resolve_target_project_id(source_project_id,
+                                                                        args.target_project_id,
+                                                                        args.target_project_name)
+                migrator.migrate_workbook(workbook, target_project_id)
+        
+        elif args.migrate_project:
+            migrator.connect_to_source()
+            migrator.connect_to_target()
+            migrator.migrate_project(args.migrate_project, args.target_project_id)
+        
+        elif args.migrate_site:
+            migrator.migrate_site()
+    
+    finally:
+        # Only clean up source server for listing operations
+        if args.list_sites or args.list_projects or args.list_workbooks:
+            if migrator.source_server:
+                migrator.source_server.auth.sign_out()
+                migrator.logger.info("Signed out of source server") 
+        else:
+            # Full cleanup for migration operations
+            migrator.cleanup()
+
+
+if __name__ == "__main__":
+    main()  